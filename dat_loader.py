@@ -3,96 +3,287 @@ Load Quantum Design MPMS3 .dat files and graph magnetization data.
 Handles [Header] / [Data] structure and DC Moment columns.
 """
 
+import functools
+import os
+import re
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Optional, Sequence, Tuple, Union
 
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import numpy as np
 import pandas as pd
 
+try:
+    # optional: enables the Parquet cache in load_dat_cached and the --pyarrow CSV reader
+    import pyarrow
+    import pyarrow.csv
+except ImportError:
+    pyarrow = None
 
-def parse_mpms_dat(filepath: Union[str, Path]) -> Tuple[pd.DataFrame, dict]:
+# Header lines: "INFO,<value>,<name>" and plain "KEY,value" (no comments, sections or "=")
+HEADER_INFO_RE = re.compile(r"^INFO,([^,]*),(.*)$")
+HEADER_KV_RE = re.compile(r"^(?![;\[])([^,=]*),([^=]*)$")
+
+# Moment columns in order of preference
+MOMENT_CANDIDATES = (
+    "DC Moment Free Ctr (emu)",
+    "DC Moment Fixed Ctr (emu)",
+    "Moment (emu)",
+)
+
+# Columns load_dat keeps for plotting
+PLOT_COLUMNS = ("Magnetic Field (Oe)", "Temperature (K)", *MOMENT_CANDIDATES)
+
+
+def parse_mpms_header_only(filepath: Union[str, Path]) -> Tuple[dict, int]:
+    """
+    Scan the [Header] section of an MPMS3 .dat file without reading the data.
+
+    Returns:
+        (header_info, data_start): dict of header key-value pairs, and the number
+        of lines before the [Data] column-name row.
+    """
+    header_info = {}
+
+    with open(filepath, encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f):
+            line = line.rstrip("\n\r")
+            if line == "[Data]":
+                return header_info, i + 1
+            m = HEADER_INFO_RE.match(line) if line.startswith("INFO,") else HEADER_KV_RE.match(line)
+            if m:
+                header_info[m.group(1).strip()] = m.group(2).strip()
+
+    raise ValueError(f"No [Data] section found in {filepath}")
+
+
+def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce text columns (e.g. Comment) to numeric; columns already parsed as numbers are left alone."""
+    text_cols = [c for c, t in df.dtypes.items() if not pd.api.types.is_numeric_dtype(t)]
+    for col in text_cols:
+        values = pd.to_numeric(df[col], errors="coerce")
+        # An empty [Data] block has nothing to infer from; keep it float like measured columns
+        df[col] = values.astype("float64") if df.empty else values
+    return df
+
+
+def _data_column_names(filepath: Union[str, Path], data_start: int) -> list:
+    """Names on the [Data] column-name row, without parsing any data rows."""
+    names = pd.read_csv(filepath, skiprows=data_start, nrows=0, encoding="utf-8", encoding_errors="replace").columns
+    return list(names)
+
+
+def _read_data_pyarrow(
+    filepath: Union[str, Path], data_start: int, columns: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Read the [Data] block with pyarrow's multithreaded CSV reader into a numpy-backed DataFrame."""
+    convert_options = None
+    if columns is not None:
+        # Only the wanted columns are converted; pyarrow reads an empty include list as "all"
+        wanted = set(columns)
+        include = [name for name in _data_column_names(filepath, data_start) if name in wanted]
+        if not include:
+            return pd.DataFrame()
+        convert_options = pyarrow.csv.ConvertOptions(include_columns=include)
+    # pd.read_csv(engine="pyarrow") applies an integer skiprows after the column names, so call pyarrow directly
+    table = pyarrow.csv.read_csv(
+        str(filepath),
+        read_options=pyarrow.csv.ReadOptions(skip_rows=data_start),
+        convert_options=convert_options,
+    )
+    return table.to_pandas()
+
+
+def parse_mpms_dat(
+    filepath: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    use_pyarrow: bool = False,
+) -> Tuple[pd.DataFrame, dict]:
     """
     Parse an MPMS3 .dat file into a DataFrame and header metadata.
 
+    Args:
+        filepath: Path to the .dat file
+        columns: If given, only these [Data] columns are parsed; names missing
+            from the file are ignored.
+        use_pyarrow: Parse the [Data] block with pyarrow when it is installed,
+            falling back to the pandas C parser if pyarrow rejects the file.
+
     Returns:
         (df, header_info): DataFrame of the [Data] section, dict of header key-value pairs.
     """
     filepath = Path(filepath)
-    with open(filepath, encoding="utf-8", errors="replace") as f:
-        lines = f.readlines()
-
-    header_info = {}
-    in_data = False
-    data_start = None
-
-    for i, line in enumerate(lines):
-        line = line.rstrip("\n\r")
-        if line == "[Data]":
-            in_data = True
-            data_start = i + 1
-            break
-        if line.startswith("INFO,"):
-            parts = line.split(",", 2)
-            if len(parts) >= 3:
-                key = parts[1].strip()
-                val = parts[2].strip()
-                header_info[key] = val
-        elif not line.startswith(";") and "," in line and "=" not in line and not line.startswith("["):
-            key_val = line.split(",", 1)
-            if len(key_val) == 2:
-                header_info[key_val[0].strip()] = key_val[1].strip()
-
-    if not in_data or data_start is None:
-        raise ValueError(f"No [Data] section found in {filepath}")
+    # Walk only the header; pandas reads the [Data] block straight from the file
+    header_info, data_start = parse_mpms_header_only(filepath)
 
     # Parse data block as CSV (header row then data rows)
-    from io import StringIO
-    data_block = "\n".join(l.rstrip("\n\r") for l in lines[data_start:])
-    df = pd.read_csv(StringIO(data_block))
-
-    # Coerce numeric columns
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = None
+    if use_pyarrow and pyarrow is not None:
+        try:
+            df = _read_data_pyarrow(filepath, data_start, columns)
+        except pyarrow.ArrowException:
+            pass  # e.g. ragged rows or bad UTF-8, which the C parser tolerates
+    if df is None:
+        usecols = None
+        if columns is not None:
+            wanted = set(columns)
+            usecols = lambda name: name in wanted
+        df = pd.read_csv(
+            filepath,
+            skiprows=data_start,
+            usecols=usecols,
+            engine="c",
+            low_memory=False,
+            encoding="utf-8",
+            encoding_errors="replace",
+        )
+
+    return _coerce_numeric(df), header_info
+
+
+def read_data_columns(filepath: Union[str, Path]) -> list:
+    """Column names of the [Data] section, without parsing any data rows."""
+    _, data_start = parse_mpms_header_only(filepath)
+    return _data_column_names(filepath, data_start)
+
+
+def summarize_dat(
+    filepath: Union[str, Path], chunksize: int = 100_000
+) -> Tuple[int, Optional[str], Optional[Tuple[float, float]]]:
+    """
+    Row count, best moment column and field range of a .dat file (for --list).
+    Only the field and moment columns are streamed, in chunks, so the full table is never built.
 
-    return df, header_info
+    Returns:
+        (rows, moment_col, field_range); field_range is None without a field column.
+    """
+    _, data_start = parse_mpms_header_only(filepath)
+    read_kwargs = dict(skiprows=data_start, engine="c", encoding="utf-8", encoding_errors="replace")
+    names = pd.read_csv(filepath, nrows=0, **read_kwargs).columns
+    field_col = "Magnetic Field (Oe)"
+    # Rows are only counted for parsed columns, so keep at least one
+    usecols = [c for c in (field_col, *MOMENT_CANDIDATES) if c in names] or [names[0]]
+
+    rows = 0
+    with_data = set()
+    field_min = field_max = np.nan
+    with pd.read_csv(filepath, usecols=usecols, chunksize=chunksize, **read_kwargs) as reader:
+        for chunk in reader:
+            chunk = _coerce_numeric(chunk)
+            rows += len(chunk)
+            with_data.update(c for c in MOMENT_CANDIDATES if c in chunk.columns and chunk[c].notna().any())
+            if field_col in chunk.columns:
+                field_min = np.fmin(field_min, chunk[field_col].min())
+                field_max = np.fmax(field_max, chunk[field_col].max())
+
+    moment_col = next((c for c in MOMENT_CANDIDATES if c in with_data), None)
+    field_range = (field_min, field_max) if field_col in names else None
+    return rows, moment_col, field_range
 
 
 def get_moment_column(df: pd.DataFrame) -> Optional[str]:
-    """Choose the best moment column: DC Moment Free Ctr, then DC Moment Fixed Ctr, then Moment (emu)."""
-    candidates = [
-        "DC Moment Free Ctr (emu)",
-        "DC Moment Fixed Ctr (emu)",
-        "Moment (emu)",
-    ]
-    for c in candidates:
+    """
+    Choose the best moment column: DC Moment Free Ctr, then DC Moment Fixed Ctr, then Moment (emu).
+    Frames from load_dat carry the choice in df.attrs["moment_col"], which skips the column scan.
+    """
+    cached = df.attrs.get("moment_col")
+    if cached in df.columns:
+        return cached
+    for c in MOMENT_CANDIDATES:
         if c in df.columns and df[c].notna().any():
             return c
     return None
 
 
-def load_dat(filepath: Union[str, Path]) -> pd.DataFrame:
+def load_dat(filepath: Union[str, Path], use_pyarrow: bool = False) -> pd.DataFrame:
     """
-    Load a single .dat file and return a DataFrame with standard columns
-    and a 'Moment' column set to the best available moment data.
+    Load a single .dat file and return a DataFrame with the field, temperature
+    and moment columns (PLOT_COLUMNS) and a 'Moment' column set to the best
+    available moment data.
+    The chosen source column is recorded in df.attrs["moment_col"].
     """
-    df, _ = parse_mpms_dat(filepath)
+    # Only the columns the plots use; MPMS files carry dozens of others
+    df, _ = parse_mpms_dat(filepath, columns=PLOT_COLUMNS, use_pyarrow=use_pyarrow)
     moment_col = get_moment_column(df)
     if moment_col:
-        df = df.assign(Moment=df[moment_col].values)
+        # The frame is freshly parsed and not shared, so add the column in place
+        df["Moment"] = df[moment_col].to_numpy(copy=False)
+        df.attrs["moment_col"] = moment_col
     return df
 
 
-def plot_moment_vs_field(
+def load_dat_cached(filepath: Union[str, Path], use_pyarrow: bool = False) -> pd.DataFrame:
+    """
+    Same as load_dat, but keep a Parquet copy next to the .dat file and reuse it
+    while it is at least as new as the source. Without pyarrow this is just load_dat.
+    """
+    filepath = Path(filepath)
+    if pyarrow is None:
+        return load_dat(filepath, use_pyarrow)
+
+    cache = filepath.with_suffix(".parquet")
+    try:
+        if cache.stat().st_mtime >= filepath.stat().st_mtime:
+            return pd.read_parquet(cache, engine="pyarrow")
+    except (OSError, ValueError):
+        pass  # missing or unreadable cache: rebuild it below
+
+    df = load_dat(filepath, use_pyarrow)
+    try:
+        df.to_parquet(cache, engine="pyarrow", compression="zstd", index=False)
+    except OSError as e:
+        print(f"Could not write cache {cache.name}: {e}")
+    return df
+
+
+def _drop_nan_pairs(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop points where x or y is NaN; clean arrays are returned as-is without copying."""
+    missing = np.isnan(x) | np.isnan(y)
+    if missing.any():
+        keep = ~missing
+        return x[keep], y[keep]
+    return x, y
+
+
+def _downsample_lttb(
+    x: np.ndarray, y: np.ndarray, max_points: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to at most max_points points with Largest-Triangle-Three-Buckets,
+    which keeps peaks and turning points that a plain stride would skip.
+    Points are bucketed in acquisition order, so unsorted sweeps (hysteresis loops) work too.
+    """
+    n = x.size
+    if max_points is None or max_points < 3 or n <= max_points:
+        return x, y
+
+    # First and last points are always kept; the rest are split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    keep = np.empty(max_points, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < edges.size else (n - 1, n)
+        cx = x[next_lo:next_hi].mean()
+        cy = y[next_lo:next_hi].mean()
+        # Twice the area of the triangle (previous kept point, candidate, next bucket mean)
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def _field_moment_xy(
     df: pd.DataFrame,
-    *,
     moment_col: Optional[str] = None,
     field_col: str = "Magnetic Field (Oe)",
-    title: Optional[str] = None,
-    ax: Optional[plt.Axes] = None,
-    label: Optional[str] = None,
-) -> plt.Figure:
-    """Plot moment (emu) vs magnetic field (Oe)."""
+    max_points: Optional[int] = 5000,
+) -> Tuple[np.ndarray, np.ndarray, str]:
+    """Resolve the moment column and return the NaN-free, downsampled (field, moment) arrays and its name."""
     if moment_col is None:
         moment_col = get_moment_column(df)
     if moment_col is None:
@@ -104,22 +295,50 @@ def plot_moment_vs_field(
 
     x = df[field_col].values
     y = df[moment_col].values
-    mask = np.isfinite(x) & np.isfinite(y)
-    x, y = x[mask], y[mask]
+    x, y = _drop_nan_pairs(x, y)
     if x.size == 0:
         raise ValueError("No finite (field, moment) pairs to plot.")
+    x, y = _downsample_lttb(x, y, max_points)
+    return x, y, moment_col
 
-    fig = None
-    if ax is None:
-        fig, ax = plt.subplots(1, 1, figsize=(8, 5))
-    ax.plot(x, y, "o-", ms=4, label=label or moment_col)
+
+def _decorate_field_axes(ax: plt.Axes) -> None:
+    """Axis labels, dashed zero lines and grid for a moment vs field plot."""
     ax.set_xlabel("Magnetic Field (Oe)")
     ax.set_ylabel("Moment (emu)")
-    if title:
-        ax.set_title(title)
     ax.axhline(0, color="gray", ls="--", alpha=0.7)
     ax.axvline(0, color="gray", ls="--", alpha=0.7)
     ax.grid(True, alpha=0.3)
+
+
+def plot_moment_vs_field(
+    df: pd.DataFrame,
+    *,
+    moment_col: Optional[str] = None,
+    field_col: str = "Magnetic Field (Oe)",
+    title: Optional[str] = None,
+    ax: Optional[plt.Axes] = None,
+    label: Optional[str] = None,
+    max_points: Optional[int] = 5000,
+) -> plt.Figure:
+    """
+    Plot moment (emu) vs magnetic field (Oe).
+    Sweeps longer than max_points are downsampled (LTTB) before drawing; None plots every point.
+    """
+    x, y, moment_col = _field_moment_xy(df, moment_col, field_col, max_points)
+    # Per-point markers dominate draw time on long sweeps
+    style = "o-" if x.size <= 1000 else "-"
+
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots(1, 1, figsize=(8, 5))
+    # Decorate the axes once; overlays onto an existing plot only add their line
+    decorate = not ax.lines
+    ax.plot(x, y, style, ms=4, label=label or moment_col)
+    if decorate:
+        _decorate_field_axes(ax)
+    if title:
+        ax.set_title(title)
     if label:
         ax.legend()
     if fig is None:
@@ -134,8 +353,12 @@ def plot_moment_vs_temperature(
     temp_col: str = "Temperature (K)",
     title: Optional[str] = None,
     ax: Optional[plt.Axes] = None,
+    max_points: Optional[int] = 5000,
 ) -> plt.Figure:
-    """Plot moment vs temperature."""
+    """
+    Plot moment vs temperature.
+    Sweeps longer than max_points are downsampled (LTTB) before drawing; None plots every point.
+    """
     if moment_col is None:
         moment_col = get_moment_column(df) or "Moment"
     if temp_col not in df.columns:
@@ -143,20 +366,24 @@ def plot_moment_vs_temperature(
 
     x = df[temp_col].values
     y = df[moment_col].values
-    mask = np.isfinite(x) & np.isfinite(y)
-    x, y = x[mask], y[mask]
+    x, y = _drop_nan_pairs(x, y)
     if x.size == 0:
         raise ValueError("No finite (temperature, moment) pairs to plot.")
+    x, y = _downsample_lttb(x, y, max_points)
+    # Per-point markers dominate draw time on long sweeps
+    style = "o-" if x.size <= 1000 else "-"
 
     fig = None
     if ax is None:
         fig, ax = plt.subplots(1, 1, figsize=(8, 5))
-    ax.plot(x, y, "o-", ms=4)
-    ax.set_xlabel("Temperature (K)")
-    ax.set_ylabel("Moment (emu)")
+    decorate = not ax.lines
+    ax.plot(x, y, style, ms=4)
+    if decorate:
+        ax.set_xlabel("Temperature (K)")
+        ax.set_ylabel("Moment (emu)")
+        ax.grid(True, alpha=0.3)
     if title:
         ax.set_title(title)
-    ax.grid(True, alpha=0.3)
     if fig is None:
         fig = plt.gcf()
     return fig
@@ -167,7 +394,20 @@ def find_dat_files(directory: Union[str, Path]) -> list:
     directory = Path(directory) if not isinstance(directory, Path) else directory
     if directory.is_file() and directory.suffix.lower() == ".dat":
         return [directory]
-    return sorted(directory.rglob("*.dat"))
+    # Iterative os.scandir walk: no Path object or extra stat per directory entry
+    found = []
+    stack = [os.fspath(directory)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".dat") and entry.is_file():
+                        found.append(entry.path)
+        except OSError:
+            continue  # skip directories we cannot read
+    return sorted(map(Path, found))
 
 
 def main():
@@ -202,7 +442,25 @@ def main():
         const="",
         help="Save figure to plots/<name>.png (or FILE if given) instead of showing",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse .dat files instead of using the .parquet cache",
+    )
+    parser.add_argument(
+        "--pyarrow",
+        action="store_true",
+        help="Parse .dat files with pyarrow's CSV reader when installed",
+    )
     args = parser.parse_args()
+    load = functools.partial(load_dat if args.no_cache else load_dat_cached, use_pyarrow=args.pyarrow)
+
+    if args.save is not None:
+        # Saving only: skip the GUI backend and let Agg simplify/chunk long paths
+        matplotlib.use("Agg")
+        plt.rcParams["path.simplify"] = True
+        plt.rcParams["path.simplify_threshold"] = 1.0
+        plt.rcParams["agg.path.chunksize"] = 10_000
 
     plots_dir = Path("plots")
     path = Path(args.path)
@@ -213,31 +471,52 @@ def main():
 
     if args.list:
         for f in dat_files:
-            df, info = parse_mpms_dat(f)
-            moment_col = get_moment_column(df)
+            rows, moment_col, field_range = summarize_dat(f)
             print(f"\n{f.name}")
-            print(f"  Rows: {len(df)}, Moment column: {moment_col}")
-            if "Magnetic Field (Oe)" in df.columns:
-                h = df["Magnetic Field (Oe)"]
-                print(f"  Field range: {h.min():.2f} .. {h.max():.2f} Oe")
+            print(f"  Rows: {rows}, Moment column: {moment_col}")
+            if field_range is not None:
+                print(f"  Field range: {field_range[0]:.2f} .. {field_range[1]:.2f} Oe")
         return
 
     if args.all and len(dat_files) > 1:
         fig, ax = plt.subplots(1, 1, figsize=(9, 6))
+        colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        segments = []
+        handles = []
         for f in dat_files:
             try:
-                df = load_dat(f)
+                df = load(f)
                 moment_col = get_moment_column(df)
                 if moment_col and "Magnetic Field (Oe)" in df.columns:
-                    plot_moment_vs_field(
-                        df,
-                        moment_col=moment_col,
-                        ax=ax,
-                        label=f.stem,
-                    )
+                    x, y, _ = _field_moment_xy(df, moment_col=moment_col)
+                    segments.append(np.column_stack((x, y)))
+                    # Proxy artist so each file still gets a legend entry
+                    marker = "o" if x.size <= 1000 else ""
+                    color = colors[len(handles) % len(colors)]
+                    handles.append(Line2D([], [], color=color, marker=marker, ms=4, label=f.stem))
             except Exception as e:
                 print(f"Skip {f.name}: {e}")
-        ax.legend()
+        # One collection draws every sweep in a single pass instead of one Line2D per file
+        seg_colors = [h.get_color() for h in handles]
+        ax.add_collection(
+            LineCollection(segments, colors=seg_colors, linewidths=plt.rcParams["lines.linewidth"])
+        )
+        # Markers for the short sweeps (as plot_moment_vs_field draws them), also in a single artist
+        marked = [i for i, seg in enumerate(segments) if len(seg) <= 1000]
+        if marked:
+            ax.scatter(
+                *np.concatenate([segments[i] for i in marked]).T,
+                s=16,
+                c=np.repeat(
+                    matplotlib.colors.to_rgba_array([seg_colors[i] for i in marked]),
+                    [len(segments[i]) for i in marked],
+                    axis=0,
+                ),
+            )
+        _decorate_field_axes(ax)
+        ax.autoscale_view()
+        if handles:
+            ax.legend(handles=handles)
         ax.set_title("Moment vs Field")
         plt.tight_layout()
         if args.save is not None:
@@ -251,10 +530,11 @@ def main():
 
     # Single file or first file
     for f in dat_files[:1] if not args.all else dat_files:
-        df = load_dat(f)
+        df = load(f)
         moment_col = get_moment_column(df)
         if not moment_col:
-            print(f"No moment column found in {f.name}. Columns: {list(df.columns)}")
+            # load_dat keeps only PLOT_COLUMNS, so list what the file actually has
+            print(f"No moment column found in {f.name}. Columns: {read_data_columns(f)}")
             continue
         title = f.stem
         if args.temp:
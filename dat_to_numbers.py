@@ -10,87 +10,241 @@ Example:
 """
 
 import argparse
+import itertools
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from io import StringIO
+from typing import Iterable, Iterator, Union
+import numpy as np
 import pandas as pd
+import xlsxwriter
 
+try:
+    import pyarrow  # optional: enables the --pyarrow CSV reader
+    import pyarrow.csv
+except ImportError:
+    pyarrow = None
 
-def parse_mpms_dat(filepath: Path) -> tuple[pd.DataFrame, dict]:
+# Hard row limit of an .xlsx worksheet
+XLSX_MAX_ROWS = 1_048_576
+
+# Process umask, applied to the streamed outputs that start life as owner-only temp files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Header lines: "INFO,<value>,<name>" and plain "KEY,value" (no comments, sections or "=")
+HEADER_INFO_RE = re.compile(r"^INFO,([^,]*),(.*)$")
+HEADER_KV_RE = re.compile(r"^(?![;\[])([^,=]*),([^=]*)$")
+
+
+def parse_mpms_header_only(filepath: Path) -> tuple[dict, int]:
     """
-    Parse an MPMS3 .dat file into a DataFrame and header metadata.
+    Scan the [Header] section of an MPMS3 .dat file without reading the data.
 
     Returns:
-        (df, header_info): DataFrame of the [Data] section, dict of header key-value pairs.
+        (header_info, data_start): dict of header key-value pairs, and the number
+        of lines before the [Data] column-name row.
     """
+    header_info = {}
+
     with open(filepath, encoding="utf-8", errors="replace") as f:
-        lines = f.readlines()
+        for i, line in enumerate(f):
+            line = line.rstrip("\n\r")
+            if line == "[Data]":
+                return header_info, i + 1
+            m = HEADER_INFO_RE.match(line) if line.startswith("INFO,") else HEADER_KV_RE.match(line)
+            if m:
+                header_info[m.group(1).strip()] = m.group(2).strip()
 
-    header_info = {}
-    in_data = False
-    data_start = None
-
-    for i, line in enumerate(lines):
-        line = line.rstrip("\n\r")
-        if line == "[Data]":
-            in_data = True
-            data_start = i + 1
-            break
-        if line.startswith("INFO,"):
-            parts = line.split(",", 2)
-            if len(parts) >= 3:
-                key = parts[1].strip()
-                val = parts[2].strip()
-                header_info[key] = val
-        elif not line.startswith(";") and "," in line and "=" not in line and not line.startswith("["):
-            key_val = line.split(",", 1)
-            if len(key_val) == 2:
-                header_info[key_val[0].strip()] = key_val[1].strip()
-
-    if not in_data or data_start is None:
-        raise ValueError(f"No [Data] section found in {filepath}")
+    raise ValueError(f"No [Data] section found in {filepath}")
 
-    # Parse data block as CSV
-    data_block = "\n".join(l.rstrip("\n\r") for l in lines[data_start:])
-    df = pd.read_csv(StringIO(data_block))
 
-    # Coerce numeric columns
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce text columns (e.g. Comment) to numeric; columns already parsed as numbers are left alone."""
+    text_cols = [c for c, t in df.dtypes.items() if not pd.api.types.is_numeric_dtype(t)]
+    for col in text_cols:
+        values = pd.to_numeric(df[col], errors="coerce")
+        # An empty [Data] block has nothing to infer from; keep it float like measured columns
+        df[col] = values.astype("float64") if df.empty else values
+    return df
+
+
+def _read_data_pyarrow(filepath: Path, data_start: int) -> pd.DataFrame:
+    """Read the [Data] block with pyarrow's multithreaded CSV reader into a numpy-backed DataFrame."""
+    # pd.read_csv(engine="pyarrow") applies an integer skiprows after the column names, so call pyarrow directly
+    table = pyarrow.csv.read_csv(str(filepath), read_options=pyarrow.csv.ReadOptions(skip_rows=data_start))
+    return table.to_pandas()
+
 
-    return df, header_info
+def parse_mpms_dat(filepath: Path, use_pyarrow: bool = False) -> tuple[pd.DataFrame, dict]:
+    """
+    Parse an MPMS3 .dat file into a DataFrame and header metadata.
+    With use_pyarrow, the [Data] block is read by pyarrow when it is installed,
+    falling back to the pandas C parser if pyarrow rejects the file.
 
+    Returns:
+        (df, header_info): DataFrame of the [Data] section, dict of header key-value pairs.
+    """
+    header_info, data_start = parse_mpms_header_only(filepath)
 
-def convert_dat_to_numbers(dat_path: Path, output_dir: Path) -> Path:
+    # Parse data block as CSV
+    df = None
+    if use_pyarrow and pyarrow is not None:
+        try:
+            df = _read_data_pyarrow(filepath, data_start)
+        except pyarrow.ArrowException:
+            pass  # e.g. ragged rows or bad UTF-8, which the C parser tolerates
+    if df is None:
+        df = pd.read_csv(
+            filepath,
+            skiprows=data_start,
+            engine="c",
+            low_memory=False,
+            encoding="utf-8",
+            encoding_errors="replace",
+        )
+    return _coerce_numeric(df), header_info
+
+
+def parse_mpms_dat_chunks(
+    filepath: Path, chunksize: int = 100_000
+) -> Iterator[tuple[dict, pd.DataFrame]]:
+    """
+    Like parse_mpms_dat, but yield the [Data] section in chunks of at most
+    `chunksize` rows so the whole table is never held in memory.
+
+    Yields:
+        (header_info, chunk_df) for each chunk; at least one (possibly empty) chunk.
+    """
+    header_info, data_start = parse_mpms_header_only(filepath)
+
+    with pd.read_csv(
+        filepath,
+        skiprows=data_start,
+        chunksize=chunksize,
+        engine="c",
+        encoding="utf-8",
+        encoding_errors="replace",
+    ) as reader:
+        for chunk in reader:
+            yield header_info, _coerce_numeric(chunk)
+
+
+def _metadata_frame(header_info: dict) -> pd.DataFrame:
+    """Header key-value pairs as a two-column Property/Value table."""
+    return pd.DataFrame({'Property': list(header_info), 'Value': list(header_info.values())})
+
+
+def _write_chunks_xlsx(output_path: Path, header_info: dict, chunks: Iterable[pd.DataFrame]) -> None:
+    """Stream chunks row by row into an .xlsx file with xlsxwriter's constant_memory mode."""
+    workbook = xlsxwriter.Workbook(str(output_path), {"constant_memory": True})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    data_sheet = workbook.add_worksheet("Data")
+    if header_info:
+        meta_sheet = workbook.add_worksheet("Metadata")
+        meta_sheet.write_row(0, 0, ["Property", "Value"], header_format)
+        for meta_row, (key, val) in enumerate(header_info.items(), start=1):
+            meta_sheet.write_row(meta_row, 0, [key, val])
+    row = 0
+    try:
+        for chunk in chunks:
+            if row == 0:
+                data_sheet.write_row(0, 0, list(chunk.columns), header_format)
+                row = 1
+
+            if row + len(chunk) > XLSX_MAX_ROWS:
+                raise ValueError(f"More than {XLSX_MAX_ROWS} rows do not fit in .xlsx; use --format csv")
+
+            values = chunk.to_numpy(dtype=object)
+            values[chunk.isna().to_numpy()] = None  # written as empty cells
+            # xlsx has no infinity; write it as text the way DataFrame.to_excel does
+            is_inf = chunk.isin([np.inf, -np.inf]).to_numpy()
+            values[is_inf] = np.where(values[is_inf] > 0, "inf", "-inf")
+            for values_row in values.tolist():
+                data_sheet.write_row(row, 0, values_row)
+                row += 1
+    finally:
+        workbook.close()
+
+
+def _write_chunks_csv(output_path: Path, chunks: Iterable[pd.DataFrame]) -> None:
+    """Append chunks to a .csv file."""
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+
+def convert_dat_to_numbers(
+    dat_path: Path, output_dir: Path, fmt: str = "xlsx", use_pyarrow: bool = False
+) -> Path:
     """
     Convert a single .dat file to .xlsx format (Apple Numbers compatible).
 
+    Raw waveform (.rw.dat) files are streamed in chunks rather than loaded whole.
+
     Args:
         dat_path: Path to input .dat file
         output_dir: Directory for output file
+        fmt: "xlsx" (Data + Metadata sheets) or "csv" (data file plus a
+            <name>.metadata.csv sidecar); Numbers opens both
+        use_pyarrow: Parse with pyarrow's CSV reader when installed (not used for .rw.dat)
 
     Returns:
-        Path to created .xlsx file
+        Path to created .xlsx (or .csv) file
     """
-    # Parse the .dat file
-    df, header_info = parse_mpms_dat(dat_path)
-
     # Create output filename (.numbers extension, but actually xlsx format)
     # Apple Numbers can open .xlsx files directly
-    output_name = dat_path.stem + ".xlsx"
+    output_name = dat_path.stem + "." + fmt
     output_path = output_dir / output_name
 
-    # Write to Excel format with openpyxl
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+    if ".rw.dat" in dat_path.name:
+        chunks = parse_mpms_dat_chunks(dat_path)
+        # Parse errors (e.g. no [Data] section) surface here, before any file is created
+        header_info, first_chunk = next(chunks)
+        frames = itertools.chain([first_chunk], (chunk for _, chunk in chunks))
+
+        # Stream into a unique temporary file so a failure part-way never leaves a
+        # truncated file and concurrent conversions never share a scratch name
+        fd, partial_name = tempfile.mkstemp(dir=output_dir, prefix="." + dat_path.stem + ".", suffix=output_path.suffix)
+        os.close(fd)
+        partial_path = Path(partial_name)
+        try:
+            if fmt == "csv":
+                _write_chunks_csv(partial_path, frames)
+            else:
+                _write_chunks_xlsx(partial_path, header_info, frames)
+            # mkstemp creates the file owner-only; give it the permissions a normal write would
+            partial_path.chmod(0o666 & ~_UMASK)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        if fmt == "csv" and header_info:
+            meta_path = output_dir / (dat_path.stem + ".metadata.csv")
+            _metadata_frame(header_info).to_csv(meta_path, index=False)
+        return output_path
+
+    # Parse the .dat file
+    df, header_info = parse_mpms_dat(dat_path, use_pyarrow)
+
+    if fmt == "csv":
+        # Plain CSV skips the xlsx XML layer entirely
+        df.to_csv(output_path, index=False)
+        if header_info:
+            meta_path = output_dir / (dat_path.stem + ".metadata.csv")
+            _metadata_frame(header_info).to_csv(meta_path, index=False)
+        return output_path
+
+    # Write to Excel format with xlsxwriter (much faster than openpyxl)
+    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
         # Write data to 'Data' sheet
         df.to_excel(writer, sheet_name='Data', index=False)
 
         # Write metadata to 'Metadata' sheet
         if header_info:
-            meta_df = pd.DataFrame(
-                list(header_info.items()),
-                columns=['Property', 'Value']
-            )
-            meta_df.to_excel(writer, sheet_name='Metadata', index=False)
+            _metadata_frame(header_info).to_excel(writer, sheet_name='Metadata', index=False)
 
     return output_path
 
@@ -100,10 +254,52 @@ def find_dat_files(path: Path) -> list[Path]:
     if path.is_file() and path.suffix.lower() == ".dat":
         return [path]
     elif path.is_dir():
-        return sorted(path.rglob("*.dat"))
+        # Iterative os.scandir walk: no Path object or extra stat per directory entry
+        found = []
+        stack = [os.fspath(path)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".dat") and entry.is_file():
+                            found.append(entry.path)
+            except OSError:
+                continue  # skip directories we cannot read
+        return sorted(map(Path, found))
     return []
 
 
+def _convert_group(
+    dat_paths: list[Path], output_dir: Path, fmt: str, use_pyarrow: bool
+) -> list[tuple[Path, Union[Path, Exception]]]:
+    """
+    Convert files that share an output name one after another, in order.
+
+    Returns:
+        (dat_path, output path or the exception raised) for each file
+    """
+    results = []
+    for dat_path in dat_paths:
+        try:
+            results.append((dat_path, convert_dat_to_numbers(dat_path, output_dir, fmt, use_pyarrow)))
+        except Exception as e:
+            results.append((dat_path, e))
+    return results
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be >= 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert MPMS .dat files to Apple Numbers format (.xlsx)"
@@ -118,11 +314,28 @@ def main():
         type=Path,
         help="Output directory for .xlsx files"
     )
+    parser.add_argument(
+        "--format",
+        choices=["xlsx", "csv"],
+        default="xlsx",
+        help="Output format (default: xlsx; csv is faster to write for large files)"
+    )
+    parser.add_argument(
+        "--pyarrow",
+        action="store_true",
+        help="Parse .dat files with pyarrow's CSV reader when installed"
+    )
     parser.add_argument(
         "--skip-rw",
         action="store_true",
         help="Skip .rw.dat files (raw waveform data, typically very large)"
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        default=os.cpu_count() or 1,
+        help="Number of files to convert in parallel (default: number of CPUs)"
+    )
 
     args = parser.parse_args()
 
@@ -143,20 +356,41 @@ def main():
     skipped = 0
     errors = 0
 
+    # Files with the same stem map to the same output file; keep them together in sorted order
+    groups: dict[str, list[Path]] = {}
     for dat_file in dat_files:
         # Skip .rw.dat files if requested (they're very large raw data)
         if args.skip_rw and ".rw.dat" in dat_file.name:
             print(f"  Skipping (raw waveform): {dat_file.name}")
             skipped += 1
             continue
-
-        try:
-            output_path = convert_dat_to_numbers(dat_file, args.output_dir)
-            print(f"  Converted: {dat_file.name} -> {output_path.name}")
-            converted += 1
-        except Exception as e:
-            print(f"  Error converting {dat_file.name}: {e}")
-            errors += 1
+        groups.setdefault(dat_file.stem, []).append(dat_file)
+
+    for stem, group in groups.items():
+        if len(group) > 1:
+            print(f"  Note: {len(group)} files convert to {stem}.{args.format}; the last one listed wins:")
+            for dat_file in group:
+                print(f"    {dat_file}")
+
+    # Each group writes its own output file, so groups run in separate processes;
+    # files within a group run one after another, as in a serial run
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {
+            executor.submit(_convert_group, group, args.output_dir, args.format, args.pyarrow): group
+            for group in groups.values()
+        }
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:  # e.g. the worker process died
+                results = [(dat_file, e) for dat_file in futures[future]]
+            for dat_file, result in results:
+                if isinstance(result, Exception):
+                    print(f"  Error converting {dat_file.name}: {result}")
+                    errors += 1
+                else:
+                    print(f"  Converted: {dat_file.name} -> {result.name}")
+                    converted += 1
 
     print(f"\nDone! Converted: {converted}, Skipped: {skipped}, Errors: {errors}")
     print(f"Output directory: {args.output_dir.absolute()}")